@@ -11,92 +11,326 @@ Description:
 """
 import tkinter as tk
 from tkinter import ttk
-import ast
+import functools
+import math
 import operator as op
+import re
+import threading
+from types import MappingProxyType
+
+try:  # Optional JIT for long expressions
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
 
 # ---------- Safe evaluator ----------
-# Supported operators
-_ALLOWED_BINOP = {
-    ast.Add: op.add,
-    ast.Sub: op.sub,
-    ast.Mult: op.mul,
-    ast.Div: op.truediv,
-    ast.Mod: op.mod,
-    ast.Pow: op.pow,
-}
-_ALLOWED_UNARY = {
-    ast.UAdd: op.pos,
-    ast.USub: op.neg,
+# Supported operators (unary forms are tagged with a "u" prefix)
+_ALLOWED_BINOP = MappingProxyType({
+    '+': op.add,
+    '-': op.sub,
+    '*': op.mul,
+    '/': op.truediv,
+    '%': op.mod,
+    '**': op.pow,
+})
+_ALLOWED_UNARY = MappingProxyType({
+    'u+': op.pos,
+    'u-': op.neg,
+})
+# Same binding as Python: unary sits between * and **, so -2**2 == -(2**2)
+_PRECEDENCE = {
+    '+': 1, '-': 1,
+    '*': 2, '/': 2, '%': 2,
+    'u+': 3, 'u-': 3,
+    '**': 4,
 }
+_RIGHT_ASSOC = frozenset({'**'})
 
-def _eval_ast(node):
-    if isinstance(node, ast.Expression):
-        return _eval_ast(node.body)
-    elif isinstance(node, ast.Constant):  # numbers
-        if isinstance(node.value, (int, float)):
-            return node.value
-        raise ValueError("Unsupported constant")
-    elif isinstance(node, ast.Num):  # for older Python
-        return node.n
-    elif isinstance(node, ast.BinOp) and type(node.op) in _ALLOWED_BINOP:
-        left = _eval_ast(node.left)
-        right = _eval_ast(node.right)
-        return _ALLOWED_BINOP[type(node.op)](left, right)
-    elif isinstance(node, ast.UnaryOp) and type(node.op) in _ALLOWED_UNARY:
-        operand = _eval_ast(node.operand)
-        return _ALLOWED_UNARY[type(node.op)](operand)
-    elif isinstance(node, ast.Expr):
-        return _eval_ast(node.value)
-    elif isinstance(node, ast.Tuple):
-        # Reject tuples
-        raise ValueError("Unsupported expression")
-    else:
-        raise ValueError("Unsupported expression")
+# Numeric literals follow Python's syntax: 0x/0o/0b ints, "_" separators,
+# and exponents (the display itself prints values like 1e-05). Each token
+# kind has its own group so _tokenize dispatches once on m.lastgroup.
+_DIGITS = r'\d(?:_?\d)*'
+_EXPONENT = rf'[eE][-+]?{_DIGITS}'
+_TOKEN_RE = re.compile(rf"""
+    (?P<prefixed>0[xX](?:_?[0-9a-fA-F])+|0[oO](?:_?[0-7])+|0[bB](?:_?[01])+)
+  | (?P<float>(?:{_DIGITS}\.(?:{_DIGITS})?|\.{_DIGITS})(?:{_EXPONENT})?|{_DIGITS}{_EXPONENT})
+  | (?P<int>{_DIGITS})
+  | (?P<pow>\*\*|\^)
+  | (?P<op>[-+*/%])
+  | (?P<paren>[()])
+  | (?P<bad>.)
+""", re.VERBOSE)
 
-def safe_eval(expr: str):
-    """
-    Evaluate a math expression safely using a restricted AST.
-    Supports: +, -, *, /, %, **, parentheses, unary +/-
-    """
-    # Map pretty symbols to Python ops
-    sanitized = (
-        expr.replace('×', '*')
-            .replace('÷', '/')
-            .replace('−', '-')
-    )
-    # Caret ^ -> ** (power)
-    sanitized = sanitized.replace('^', '**')
-    # Remove whitespace
-    sanitized = ''.join(sanitized.split())
+def _tokenize(s: str):
+    for m in _TOKEN_RE.finditer(s):
+        kind = m.lastgroup
+        if kind == 'int':
+            # Keep integer literals exact, like Python does
+            yield ('num', int(m.group()))
+        elif kind == 'op':
+            yield ('op', m.group())
+        elif kind == 'float':
+            yield ('num', float(m.group()))
+        elif kind == 'paren':
+            yield (m.group(), None)
+        elif kind == 'pow':
+            yield ('op', '**')
+        elif kind == 'prefixed':
+            yield ('num', int(m.group(), 0))
+        else:
+            raise ValueError("Unsupported character")
+
+def _shunting_yard(tokens):
+    output = []
+    stack = []
+    expect_operand = True
+    for kind, value in tokens:
+        if kind == 'num':
+            if not expect_operand:
+                raise ValueError("Unexpected number")
+            output.append((kind, value))
+            expect_operand = False
+        elif kind == '(':
+            if not expect_operand:
+                raise ValueError("Unexpected parenthesis")
+            stack.append((kind, value))
+        elif kind == ')':
+            if expect_operand:
+                raise ValueError("Unexpected parenthesis")
+            while stack and stack[-1][0] != '(':
+                output.append(stack.pop())
+            if not stack:
+                raise ValueError("Unbalanced parentheses")
+            stack.pop()
+        elif expect_operand:
+            # Prefix sign: binds to what follows, never pops anything
+            if value not in ('+', '-'):
+                raise ValueError("Unexpected operator")
+            stack.append((kind, 'u' + value))
+        else:
+            prec = _PRECEDENCE[value]
+            right = value in _RIGHT_ASSOC
+            while stack and stack[-1][0] == 'op':
+                top = _PRECEDENCE[stack[-1][1]]
+                if top > prec or (top == prec and not right):
+                    output.append(stack.pop())
+                else:
+                    break
+            stack.append((kind, value))
+            expect_operand = True
+    if expect_operand:
+        raise ValueError("Incomplete expression")
+    while stack:
+        tok = stack.pop()
+        if tok[0] == '(':
+            raise ValueError("Unbalanced parentheses")
+        output.append(tok)
+    return tuple(output)
+
+def _fold(rpn):
+    # Signs applied straight to a literal become part of the literal, so the
+    # cached program (and its JIT encoding) carries fewer ops
+    out = []
+    for tok in rpn:
+        if tok[1] in _ALLOWED_UNARY and out and out[-1][0] == 'num':
+            out[-1] = ('num', _ALLOWED_UNARY[tok[1]](out[-1][1]))
+        else:
+            out.append(tok)
+    return tuple(out)
+
+def _eval_rpn(rpn):
+    stack = []
+    for kind, value in rpn:
+        if kind == 'num':
+            stack.append(value)
+        elif value in _ALLOWED_UNARY:
+            stack.append(_ALLOWED_UNARY[value](stack.pop()))
+        else:
+            right = stack.pop()
+            stack.append(_ALLOWED_BINOP[value](stack.pop(), right))
+    return stack[0]
+
+# RPN programs keyed by sanitized expression (oldest entry evicted first)
+_RPN_CACHE_MAX = 512
+_RPN_CACHE = {}
+
+def _compile(sanitized: str):
+    rpn = _RPN_CACHE.get(sanitized)
+    if rpn is None:
+        rpn = _fold(_shunting_yard(_tokenize(sanitized)))
+        _RPN_CACHE[sanitized] = rpn
+        if len(_RPN_CACHE) > _RPN_CACHE_MAX:
+            del _RPN_CACHE[next(iter(_RPN_CACHE))]
+    return rpn
+
+# ---------- Optional Numba path ----------
+# RPN encoded as parallel arrays: opcode per slot, operand value for pushes
+_OPCODES = {'+': 0, '-': 1, '*': 2, '/': 3, '%': 4, '**': 5, 'u-': 6}
+_PUSH = 7
+# Only worth it for long programs
+_JIT_MIN_TOKENS = 32
+_JIT_READY = threading.Event()
+_jit_thread = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _run(codes, vals):
+        # Returns nan wherever Python's float arithmetic would not simply give
+        # a finite float (zero divisor, overflow, complex power); the caller
+        # then re-evaluates on the Python path
+        stack = np.empty(codes.shape[0])
+        sp = 0
+        i = 0
+        while i < codes.shape[0]:
+            c = codes[i]
+            if c == 7:
+                stack[sp] = vals[i]
+                sp += 1
+            elif c == 6:
+                stack[sp - 1] = -stack[sp - 1]
+            else:
+                sp -= 1
+                a = stack[sp - 1]
+                b = stack[sp]
+                if c == 0:
+                    r = a + b
+                elif c == 1:
+                    r = a - b
+                elif c == 2:
+                    r = a * b
+                elif c == 3 or c == 4:
+                    if b == 0.0:
+                        return np.nan
+                    r = a / b if c == 3 else a % b
+                else:
+                    r = a ** b
+                if not np.isfinite(r):
+                    return np.nan
+                stack[sp - 1] = r
+            i += 1
+        return stack[0]
+else:
+    _run = None
+
+def _encode(rpn):
+    # Unary plus is a no-op, so it is dropped from the array program
+    rpn = [tok for tok in rpn if tok[1] != 'u+']
+    codes = np.empty(len(rpn), dtype=np.int8)
+    vals = np.zeros(len(rpn), dtype=np.float64)
+    for i, (kind, value) in enumerate(rpn):
+        if kind == 'num':
+            codes[i] = _PUSH
+            vals[i] = value
+        else:
+            codes[i] = _OPCODES[value]
+    return codes, vals
 
+def _jit_eligible(rpn) -> bool:
+    # With only float literals Python computes every step in float64 too,
+    # so the JIT cannot change the digits; int programs stay exact in Python
+    return all(type(value) is float for kind, value in rpn if kind == 'num')
+
+def _warm_jit():
+    # Program for 1.0+1.0, built here so the worker thread never touches caches
+    codes = np.array([_PUSH, _PUSH, _OPCODES['+']], dtype=np.int8)
+    vals = np.array([1.0, 1.0, 0.0])
+    _run(codes, vals)
+    _JIT_READY.set()
+
+def _jit_ready() -> bool:
+    """Start compiling in the background on first use; True once it is done."""
+    global _jit_thread
+    if _run is None:
+        return False
+    if _jit_thread is None:
+        _jit_thread = threading.Thread(target=_warm_jit, daemon=True)
+        _jit_thread.start()
+    return _JIT_READY.is_set()
+
+# Every str.isspace() character, so they are dropped like str.split() did
+_WHITESPACE = (
+    '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680'
+    '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+    '\u2028\u2029\u202f\u205f\u3000'
+)
+# Pretty symbols -> Python ops, caret -> power, whitespace dropped
+_TRANS = str.maketrans('×÷−', '*/-', _WHITESPACE)
+_TRANS[ord('^')] = '**'
+
+def _sanitize(expr: str) -> str:
+    """Map pretty symbols to Python ops and strip whitespace."""
+    return expr.translate(_TRANS)
+
+@functools.lru_cache(maxsize=256)
+def _eval_sanitized(sanitized: str):
+    # Results are plain ints/floats, so memoizing per expression string is safe
     if not sanitized:
         return 0
 
-    # Parse and evaluate
-    tree = ast.parse(sanitized, mode='eval')
-    return _eval_ast(tree)
+    rpn = _compile(sanitized)
+    if _jit_ready() and len(rpn) >= _JIT_MIN_TOKENS and _jit_eligible(rpn):
+        result = float(_run(*_encode(rpn)))
+        if math.isfinite(result):
+            return result
+    return _eval_rpn(rpn)
+
+def safe_eval(expr: str):
+    """
+    Evaluate a math expression safely with a small shunting-yard parser.
+    Supports: +, -, *, /, %, **, parentheses, unary +/-
+    Repeated expressions are served from a small LRU cache.
+    """
+    return _eval_sanitized(_sanitize(expr))
 
 # ---------- UI ----------
 class Calculator(tk.Tk):
+    # Colors / theme
+    COLOR_BG = "#f5f9ff"
+    COLOR_PANEL = "#e6f0ff"
+    COLOR_BLUE = "#2563eb"
+    COLOR_BLUE_DARK = "#1d4ed8"
+    COLOR_TEXT = "#0f172a"
+    COLOR_WHITE = "#ffffff"
+
+    # Fonts
+    FONT_DISPLAY = ("Segoe UI", 26, "bold")
+    FONT_BTN = ("Segoe UI", 14, "bold")
+    FONT_HDR = ("Segoe UI", 12, "bold")
+
+    # Button definitions: text, row, col, kind
+    # kind: "op" (blue), "eq" (primary), "ctrl" (light), "num" (white)
+    _BUTTONS = (
+        ("C",   0, 0, "ctrl"), ("⌫",  0, 1, "ctrl"), ("%",  0, 2, "op"),  ("÷", 0, 3, "op"),
+        ("7",   1, 0, "num"),  ("8",  1, 1, "num"),  ("9",  1, 2, "num"), ("×", 1, 3, "op"),
+        ("4",   2, 0, "num"),  ("5",  2, 1, "num"),  ("6",  2, 2, "num"), ("−", 2, 3, "op"),
+        ("1",   3, 0, "num"),  ("2",  3, 1, "num"),  ("3",  3, 2, "num"), ("+", 3, 3, "op"),
+        ("0",  4, 1, "num"),  (".",  4, 2, "num"), ("=", 4, 3, "eq"),
+    )
+    # Keysyms typed into the display when it does not have focus ('^' is
+    # power, allowed by evaluator); same set the old per-character bindings
+    # matched, so keypad keys (KP_Add, KP_1, ...) are left alone
+    _ALLOWED_KEYS = frozenset((
+        "0", "1", "2", "3", "4", "5", "6", "7", "8", "9",
+        "plus", "minus", "asterisk", "slash", "parenleft", "parenright",
+        "period", "percent", "asciicircum",
+    ))
+
+    # kind -> (bg, fg, activebackground)
+    _KIND_STYLE = {
+        "eq": (COLOR_BLUE_DARK, COLOR_WHITE, "#1e40af"),
+        "op": (COLOR_BLUE, COLOR_WHITE, "#1e3a8a"),
+        "ctrl": (COLOR_PANEL, COLOR_TEXT, "#c7dbff"),
+        "num": (COLOR_WHITE, COLOR_TEXT, "#e5e7eb"),
+    }
+
     def __init__(self):
         super().__init__()
         self.title("เครื่องคิดเลข - Blue & White")
         self.configure(bg="#f5f9ff")
         self.resizable(False, False)
 
-        # Colors / theme
-        self.COLOR_BG = "#f5f9ff"
-        self.COLOR_PANEL = "#e6f0ff"
-        self.COLOR_BLUE = "#2563eb"
-        self.COLOR_BLUE_DARK = "#1d4ed8"
-        self.COLOR_TEXT = "#0f172a"
-        self.COLOR_WHITE = "#ffffff"
-
-        # Fonts
-        self.FONT_DISPLAY = ("Segoe UI", 26, "bold")
-        self.FONT_BTN = ("Segoe UI", 14, "bold")
-        self.FONT_HDR = ("Segoe UI", 12, "bold")
-
         # Header bar
         header = tk.Frame(self, bg=self.COLOR_BLUE, height=46)
         header.pack(fill="x", side="top")
@@ -128,6 +362,11 @@ class Calculator(tk.Tk):
         )
         hint.pack(anchor="e", pady=(0, 10))
 
+        # Calculation state: pending debounce timer and last answer shown
+        self._calc_pending = None
+        self._last_expr = None
+        self._last_result = None
+
         # Buttons
         btns = tk.Frame(container, bg=self.COLOR_BG)
         btns.grid(row=1, column=0, sticky="nsew")
@@ -136,28 +375,22 @@ class Calculator(tk.Tk):
         for j in range(4):
             btns.grid_columnconfigure(j, weight=1, minsize=78)
 
-        # Button definitions: text, row, col, kind
-        # kind: "op" (blue), "eq" (primary), "ctrl" (light), "num" (white)
-        buttons = [
-            ("C",   0, 0, "ctrl"), ("⌫",  0, 1, "ctrl"), ("%",  0, 2, "op"),  ("÷", 0, 3, "op"),
-            ("7",   1, 0, "num"),  ("8",  1, 1, "num"),  ("9",  1, 2, "num"), ("×", 1, 3, "op"),
-            ("4",   2, 0, "num"),  ("5",  2, 1, "num"),  ("6",  2, 2, "num"), ("−", 2, 3, "op"),
-            ("1",   3, 0, "num"),  ("2",  3, 1, "num"),  ("3",  3, 2, "num"), ("+", 3, 3, "op"),
-            ("0",  4, 1, "num"),  (".",  4, 2, "num"), ("=", 4, 3, "eq"),
-        ]
-
-        for (text, r, c, kind) in buttons:
+        # Special buttons; everything else inserts its own text
+        self._btn_commands = {
+            "C": self._clear,
+            "⌫": self._backspace,
+            "=": self._calculate,
+        }
+        for text, r, c, kind in self._BUTTONS:
             self._make_button(btns, text, r, c, kind)
 
         # Keyboard bindings
-        self.bind("<Return>", lambda e: self._calculate())
-        self.bind("=", lambda e: self._calculate())
+        self.bind("<Return>", lambda e: self._schedule_calculate())
         self.bind("<Escape>", lambda e: self._clear())
         self.bind("<BackSpace>", lambda e: self._backspace())
-        for ch in "0123456789+-*/().%":
-            self.bind(ch, self._type_char)
-        # Support '^' for power (will show as caret; allowed by evaluator)
-        self.bind("^", self._type_char)
+        self.bind("<KeyPress>", self._type_char)
+        # Runs before the Entry class binding, so "=" is never inserted
+        self.display.bind("<equal>", self._type_char)
 
         # Focus the display
         self.display.focus_set()
@@ -174,22 +407,7 @@ class Calculator(tk.Tk):
 
     # ---------- Button/UI helpers ----------
     def _make_button(self, parent, text, r, c, kind):
-        if kind == "eq":
-            bg = self.COLOR_BLUE_DARK
-            fg = self.COLOR_WHITE
-            active = "#1e40af"
-        elif kind == "op":
-            bg = self.COLOR_BLUE
-            fg = self.COLOR_WHITE
-            active = "#1e3a8a"
-        elif kind == "ctrl":
-            bg = self.COLOR_PANEL
-            fg = self.COLOR_TEXT
-            active = "#c7dbff"
-        else:  # num
-            bg = self.COLOR_WHITE
-            fg = self.COLOR_TEXT
-            active = "#e5e7eb"
+        bg, fg, active = self._KIND_STYLE[kind]
 
         btn = tk.Button(
             parent, text=text, font=self.FONT_BTN, bd=0,
@@ -200,14 +418,10 @@ class Calculator(tk.Tk):
         btn.grid(row=r, column=c, sticky="nsew", padx=6, pady=6, ipady=10)
 
         # Bind action
-        if text == "C":
-            btn.configure(command=self._clear)
-        elif text == "⌫":
-            btn.configure(command=self._backspace)
-        elif text == "=":
-            btn.configure(command=self._calculate)
-        else:
-            btn.configure(command=lambda t=text: self._insert_text(t))
+        command = self._btn_commands.get(text)
+        if command is None:
+            command = lambda t=text: self._insert_text(t)
+        btn.configure(command=command)
 
     # ---------- Actions ----------
     def _insert_text(self, t: str):
@@ -221,22 +435,39 @@ class Calculator(tk.Tk):
         if current:
             self.display_var.set(current[:-1])
 
+    def _schedule_calculate(self):
+        # Collapse key autorepeat into a single evaluation
+        if self._calc_pending:
+            self.after_cancel(self._calc_pending)
+        self._calc_pending = self.after(50, self._calculate)
+
     def _calculate(self):
+        self._calc_pending = None
         expr = self.display.get()
+        if expr == self._last_expr:
+            # Same expression as the last "=": reuse its answer
+            self.display_var.set(self._last_result)
+            return
         try:
             result = safe_eval(expr)
             # Clean formatting: int if whole number, else float
             if isinstance(result, float) and result.is_integer():
                 result = int(result)
-            self.display_var.set(str(result))
+            result = str(result)
         except Exception:
-            self.display_var.set("Error")
+            result = "Error"
+        self._last_expr = expr
+        self._last_result = result
+        self.display_var.set(result)
 
     def _type_char(self, event):
-        # Allow only relevant printable keys
-        ch = event.char
-        if ch:
-            self.display.insert("end", ch)
+        # Allow only relevant printable keys; "=" calculates like Enter
+        if event.keysym == "equal":
+            self._schedule_calculate()
+            return "break"
+        # With focus in the display its own Entry binding already inserted it
+        if event.keysym in self._ALLOWED_KEYS and event.widget is not self.display:
+            self.display.insert("end", event.char)
 
 if __name__ == "__main__":
     app = Calculator()
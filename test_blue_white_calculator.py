@@ -0,0 +1,112 @@
+import sys
+import unittest
+
+import blue_white_calculator
+from blue_white_calculator import safe_eval
+
+
+class SafeEvalTest(unittest.TestCase):
+    # expression -> expected result (type matters: ints stay exact)
+    CASES = {
+        "": 0,
+        "1+2*3": 7,
+        "7/2": 3.5,
+        "7%3": 1,
+        "-7%3": 2,
+        "(1+2)*3": 9,
+        "2**100": 2 ** 100,
+        # Precedence / associativity, same as Python
+        "-2**2": -4,
+        "2**-1": 0.5,
+        "2*-3**2": -18,
+        "2^3^2": 512,
+        "--3": 3,
+        "+-+5": -5,
+        # Pretty symbols and whitespace
+        " 8 ÷ 2 × 3 − 1 ": 11.0,
+        "1\u2009000\u202f+\u30002\xa0\t\n": 1002,
+        # Python numeric literal forms
+        "1e5": 100000.0,
+        "1.5e3": 1500.0,
+        "1E+2": 100.0,
+        ".5e1": 5.0,
+        "2.": 2.0,
+        "0x10": 16,
+        "0o7+0b101": 12,
+        "1_000": 1000,
+    }
+
+    # Results as the display shows them, typed onward
+    REENTERED = {
+        "1e-05×2": 2e-05,
+        "1e-05+1": 1.00001,
+        "1.2676506002282294e+30/2": 6.338253001141147e+29,
+        "0.30000000000000004-0.1": 0.20000000000000004,
+    }
+
+    MALFORMED = [
+        "1+", "*2", "()", "(1", "1)", "2(3)", "1.2.3", "1e", "0x", "1__0",
+        "1_", "abs(1)", "x", "1//2", "1<2", "=", "Error",
+    ]
+
+    def test_values(self):
+        for expr, expected in {**self.CASES, **self.REENTERED}.items():
+            with self.subTest(expr=expr):
+                result = safe_eval(expr)
+                self.assertEqual(result, expected)
+                self.assertIs(type(result), type(expected))
+
+    def test_malformed(self):
+        for expr in self.MALFORMED:
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError):
+                    safe_eval(expr)
+
+    def test_division_by_zero(self):
+        for expr in ("1/0", "1%0", "0**-1"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ZeroDivisionError):
+                    safe_eval(expr)
+
+
+class SanitizeTest(unittest.TestCase):
+    def test_whitespace_matches_str_split(self):
+        everything = "".join(map(chr, range(sys.maxunicode + 1)))
+        expected = "".join(everything.split())
+        for src, dst in (("×", "*"), ("÷", "/"), ("−", "-"), ("^", "**")):
+            expected = expected.replace(src, dst)
+        self.assertEqual(blue_white_calculator._sanitize(everything), expected)
+
+
+class LongExpressionTest(unittest.TestCase):
+    # Long enough for the optional Numba path; answers must not depend on it
+
+    @classmethod
+    def setUpClass(cls):
+        # Wait for the background compile so the JIT path is really taken
+        blue_white_calculator._jit_ready()
+        if blue_white_calculator._jit_thread is not None:
+            blue_white_calculator._jit_thread.join()
+
+    def test_int_programs_stay_exact(self):
+        self.assertEqual(safe_eval("*".join(map(str, range(1, 26)))),
+                         15511210043330985984000000)
+        self.assertEqual(safe_eval("10**400" + "+0" * 20), 10 ** 400)
+
+    def test_complex_power_falls_back(self):
+        result = safe_eval("(-8.0)**(1.0/3.0)" + "+0.0" * 20)
+        self.assertIsInstance(result, complex)
+
+    def test_overflow_and_zero_divisor_fall_back(self):
+        with self.assertRaises(OverflowError):
+            safe_eval("10.0**400.0" + "+0.0" * 20)
+        with self.assertRaises(ZeroDivisionError):
+            safe_eval("1.0/0.0" + "+0.0" * 20)
+
+    def test_float_programs(self):
+        expr = "+".join(["0.1"] * 20)
+        self.assertEqual(safe_eval(expr), sum([0.1] * 20))
+
+
+if __name__ == "__main__":
+    unittest.main()